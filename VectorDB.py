@@ -1,9 +1,11 @@
 import os
 import json
+import functools
+import threading
 import numpy as np
 from typing import List, Dict, Any
 import faiss
-from sentence_transformers import SentenceTransformer, CrossEncoder
+from models import bi_encoder, cross_encoder
 
 class VectorStore:
     def __init__(self, persist_directory: str = "faiss_db"):
@@ -11,20 +13,82 @@ class VectorStore:
         self.persist_directory = persist_directory
         os.makedirs(persist_directory, exist_ok=True)
 
-        # Initialize FAISS index with cosine similarity (Inner Product)
+        # Initialize FAISS index with cosine similarity (Inner Product).
+        # The index type comes from the FAISS_INDEX factory string; HNSW
+        # gives sub-linear search once the corpus outgrows brute force.
         self.dimension = 384  # Must match BGE-small
-        self.index = faiss.IndexFlatIP(self.dimension)
+        self.index_spec = os.getenv('FAISS_INDEX', 'HNSW32,Flat')
+        self.index = self._new_index()
+
+        # Log SIMD level so a fallback to a generic (non-AVX) build shows up
+        print(f"FAISS compile options: {faiss.get_compile_options()}")
 
         # Store metadata
         self.documents = []
         self.metadata = []
 
+        # One store is shared across Streamlit sessions; reloads must
+        # not run concurrently with each other
+        self._reload_lock = threading.Lock()
+
         # Load existing index if available
         self._load_index()
 
-        # Initialize embedding and reranking models
-        self.model = SentenceTransformer('BAAI/bge-small-en-v1.5')
-        self.reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
+        # Shared model singletons; see models.py
+        self.model = bi_encoder()
+        self.reranker = cross_encoder()
+
+        # Repeated query strings (e.g. Streamlit reruns) skip the encoder
+        self._encode_query = functools.lru_cache(maxsize=512)(self._encode_query_uncached)
+
+    def _encode_query_uncached(self, query_text: str) -> np.ndarray:
+        """Encode and normalize a single query string."""
+        # sentence-transformers normalizes on-device; no numpy second pass
+        return self.model.encode(query_text, normalize_embeddings=True)
+
+    _SCALAR_QUANTIZERS = {
+        'SQfp16': 'QT_fp16',  # 2x smaller than FP32
+        'SQ8': 'QT_8bit',     # 4x smaller
+    }
+
+    def _new_index(self, n_vectors: int = 0):
+        """Create an empty index for the configured factory spec.
+
+        FAISS_INDEX='SQfp16' or 'SQ8' stores quantized vectors, halving or
+        quartering memory bandwidth on the brute-force search path.
+        Brute-force IndexFlatIP is exact and cheap on small corpora, so it
+        is used for other specs below 10k vectors.
+        """
+        if self.index_spec in self._SCALAR_QUANTIZERS:
+            qtype = getattr(faiss.ScalarQuantizer,
+                            self._SCALAR_QUANTIZERS[self.index_spec])
+            return faiss.IndexScalarQuantizer(
+                self.dimension, qtype, faiss.METRIC_INNER_PRODUCT)
+        if 0 < n_vectors < 10_000:
+            return faiss.IndexFlatIP(self.dimension)
+        index = faiss.index_factory(
+            self.dimension, self.index_spec, faiss.METRIC_INNER_PRODUCT)
+        if isinstance(index, faiss.IndexHNSWFlat):
+            index.hnsw.efConstruction = 200
+            index.hnsw.efSearch = 64
+        return index
+
+    def _to_gpu(self, index):
+        """Move the index to GPU when a CUDA-enabled FAISS build sees one.
+
+        Brute-force search becomes a single cuBLAS matrix multiply on GPU;
+        faiss-cpu builds lack the GPU symbols, so everything is guarded.
+        The GPU cloner only supports the Flat/IVF families, so HNSW and
+        scalar-quantized specs fall back to CPU instead of crashing.
+        """
+        if getattr(faiss, 'get_num_gpus', lambda: 0)() > 0:
+            try:
+                self.gpu_res = faiss.StandardGpuResources()
+                return faiss.index_cpu_to_gpu(self.gpu_res, 0, index)
+            except RuntimeError as e:
+                print(f"FAISS GPU clone not supported for '{self.index_spec}', "
+                      f"staying on CPU: {e}")
+        return index
 
     def _load_index(self):
         """Load existing FAISS index and metadata if available."""
@@ -32,7 +96,7 @@ class VectorStore:
         metadata_path = os.path.join(self.persist_directory, "metadata.json")
 
         if os.path.exists(index_path):
-            self.index = faiss.read_index(index_path)
+            self.index = self._to_gpu(faiss.read_index(index_path))
             if os.path.exists(metadata_path):
                 with open(metadata_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
@@ -44,7 +108,12 @@ class VectorStore:
         index_path = os.path.join(self.persist_directory, "index.faiss")
         metadata_path = os.path.join(self.persist_directory, "metadata.json")
 
-        faiss.write_index(self.index, index_path)
+        # Check the index itself rather than a sticky gpu_res attribute;
+        # self.index may be a fresh CPU index rebuilt after a GPU clone
+        index = self.index
+        if isinstance(index, getattr(faiss, 'GpuIndex', ())):
+            index = faiss.index_gpu_to_cpu(index)
+        faiss.write_index(index, index_path)
         with open(metadata_path, 'w', encoding='utf-8') as f:
             json.dump({
                 'documents': self.documents,
@@ -52,51 +121,94 @@ class VectorStore:
             }, f, ensure_ascii=False, indent=2)
 
     def load_embeddings(self, embeddings_dir: str = "chunked_texts"):
-        """Load embeddings from all JSON files in the directory."""
+        """Load embeddings from all .npy files in the directory."""
         if not os.path.exists(embeddings_dir):
             print(f"Embeddings directory {embeddings_dir} not found.")
             return
 
-        # Clear existing data
-        self.index = faiss.IndexFlatIP(self.dimension)
-        self.documents = []
-        self.metadata = []
-
+        # Build into locals and swap onto self at the end: queries from
+        # other sessions must never see a cleared documents list paired
+        # with the old, still-populated index
+        documents = []
+        metadata = []
+        batches = []
         for filename in os.listdir(embeddings_dir):
-            if filename.endswith('_embeddings.json'):
-                source_file = filename.replace('_embeddings.json', '.pdf')
+            if filename.endswith('_embeddings.npy'):
+                source_file = filename.replace('_embeddings.npy', '.pdf')
                 embeddings_file = os.path.join(embeddings_dir, filename)
+                sidecar_file = os.path.join(
+                    embeddings_dir, filename.replace('_embeddings.npy', '_chunks.json'))
 
                 print(f"Loading embeddings from {filename}...")
-                with open(embeddings_file, 'r', encoding='utf-8') as f:
+                with open(sidecar_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     chunks = data['chunks']
-                    embeddings = data['embeddings']
                     headers = data.get('headers', ["Unknown"] * len(chunks))
 
-                for i, (text, embedding) in enumerate(zip(chunks, embeddings)):
-                    embedding = np.array(embedding, dtype=np.float32)
-                    embedding = embedding / np.linalg.norm(embedding)  # Normalize for cosine
-                    self.index.add(np.array([embedding]))
-                    self.documents.append(text)
-                    self.metadata.append({
+                # mmap the matrix so nothing is parsed; the float32 copy
+                # upcasts the on-disk float16 at the FAISS boundary and
+                # gives the in-place normalization a contiguous buffer
+                emb = np.array(np.load(embeddings_file, mmap_mode='r'), dtype=np.float32)
+                faiss.normalize_L2(emb)  # in-place SIMD normalize for cosine
+                batches.append(emb)
+                documents.extend(chunks)
+                metadata.extend([
+                    {
                         'source': source_file,
                         'chunk_index': i,
                         'file_type': 'pdf',
                         'header': headers[i]
-                    })
+                    }
+                    for i in range(len(chunks))
+                ])
+
+        # A single batched add lets FAISS process one contiguous matrix
+        # instead of paying one call overhead per vector
+        if batches:
+            all_emb = np.concatenate(batches)
+            index = self._new_index(len(all_emb))
+            if not index.is_trained:
+                index.train(all_emb)  # IVF/PQ variants need training
+            index.add(all_emb)
+        else:
+            index = self._new_index()
 
+        self.documents = documents
+        self.metadata = metadata
+        self.index = index
         self._save_index()
+        self.index = self._to_gpu(self.index)
         print(f"Loaded {len(self.documents)} chunks from {len(os.listdir(embeddings_dir))} files")
 
-    def query(self, query_text: str, n_results: int = 5, rerank: bool = True) -> List[Dict[str, Any]]:
-        """Query the vector store for similar documents."""
-        query_embedding = self.model.encode(query_text)
-        query_embedding = query_embedding / np.linalg.norm(query_embedding)  # Normalize
+    def sync_if_dirty(self, embeddings_dir: str = "chunked_texts"):
+        """Reload embeddings only if any are newer than the saved index."""
+        if not os.path.exists(embeddings_dir):
+            return
+
+        with self._reload_lock:
+            index_path = os.path.join(self.persist_directory, "index.faiss")
+            index_mtime = (os.path.getmtime(index_path)
+                           if os.path.exists(index_path) else -1.0)
+            stale = any(
+                os.path.getmtime(os.path.join(embeddings_dir, f)) > index_mtime
+                for f in os.listdir(embeddings_dir)
+                if f.endswith('_embeddings.npy')
+            )
+            if stale:
+                self.load_embeddings(embeddings_dir)
+
+    def query(self, query_text: str, n_results: int = 5, rerank: bool = True,
+              rerank_k: int = 50) -> List[Dict[str, Any]]:
+        """Query the vector store for similar documents.
+
+        When reranking, rerank_k candidates are retrieved from FAISS,
+        scored by the cross-encoder, and truncated to n_results.
+        """
+        query_embedding = self._encode_query(query_text)
 
         distances, indices = self.index.search(
             np.array([query_embedding], dtype=np.float32),
-            n_results
+            rerank_k if rerank else n_results
         )
 
         results = []
@@ -111,12 +223,41 @@ class VectorStore:
         if rerank and results:
             texts = [r['text'] for r in results]
             pairs = [[query_text, doc] for doc in texts]
-            scores = self.reranker.predict(pairs)
-            ranked = sorted(zip(scores, results), reverse=True, key=lambda x: x[0])
-            results = [r for _, r in ranked]
+            scores = np.asarray(self.reranker.predict(
+                pairs, batch_size=len(pairs), convert_to_numpy=True))
+            # argpartition selects the top n in O(K); only those get sorted
+            top = np.argpartition(-scores, min(n_results, len(scores) - 1))[:n_results]
+            top = top[np.argsort(-scores[top])]
+            results = [results[i] for i in top]
 
         return results
 
+    def query_batch(self, query_texts: List[str], n_results: int = 5) -> List[List[Dict[str, Any]]]:
+        """Search several queries with one batched FAISS call.
+
+        A multi-row search hits FAISS's matrix-multiply path instead of
+        one dot-product sweep per query; use this from pipelines or
+        evaluation scripts rather than looping over query().
+        """
+        emb = self.model.encode(
+            query_texts, batch_size=32, convert_to_numpy=True,
+            normalize_embeddings=True).astype(np.float32)
+
+        distances, indices = self.index.search(emb, n_results)
+
+        all_results = []
+        for row, idx_row in enumerate(indices):
+            results = []
+            for i, idx in enumerate(idx_row):
+                if idx >= 0:
+                    results.append({
+                        'text': self.documents[idx],
+                        'distance': float(distances[row][i]),
+                        'metadata': self.metadata[idx]
+                    })
+            all_results.append(results)
+        return all_results
+
     def get_all_documents(self) -> List[Dict[str, Any]]:
         """Retrieve all documents from the store."""
         return [
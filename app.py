@@ -1,10 +1,11 @@
 import streamlit as st
+import io
 import os
 import pdfocr
 import embedding
+import pipeline
 from VectorDB import VectorStore
 import drive  # Import the drive module for Google Drive integration
-from mistral import client, model  # Import Mistral client and model
 
 # Ensure necessary folders exist
 os.makedirs('downloads', exist_ok=True)
@@ -12,6 +13,17 @@ os.makedirs('extracted_text', exist_ok=True)
 os.makedirs('chunked_texts', exist_ok=True)
 os.makedirs('faiss_db', exist_ok=True)
 
+@st.cache_resource
+def get_store():
+    """Load the vector store (and its models) once per Streamlit process."""
+    return VectorStore()
+
+@st.cache_resource
+def get_mistral():
+    """Create the Mistral client once instead of on every rerun."""
+    from mistral import get_client, model
+    return get_client(), model
+
 def process_file(file_path):
     # Process PDF OCR
     st.write("Processing PDF for text extraction...")
@@ -31,31 +43,30 @@ def process_file(file_path):
         embedding.save_chunked_texts(processed)
         st.success("Embeddings processed successfully!")
 
-        # Load into vector DB
-        st.write("Loading into vector database...")
-        vector_store = VectorStore()
-        vector_store.load_embeddings()
-        st.success("Vector database updated successfully!")
+        st.success("Embeddings ready for the vector database!")
     else:
         st.error("Could not extract text from PDF.")
 
+# Per-chunk character budget for the Mistral prompt, bounding token cost
+MAX_CHUNK_CHARS = 2000
+
 def process_with_mistral(chunks, query):
     """Process relevant chunks with Mistral LLM"""
     try:
-        # Combine chunks into context
-        context = "\n\n".join([f"Chunk {i+1}:\n{chunk['text']}" for i, chunk in enumerate(chunks)])
-        
-        # Create prompt for Mistral
-        prompt = f"""Based on the following context and query, provide a comprehensive answer.
-        
-Query: {query}
-
-Context:
-{context}
-
-Please provide a detailed answer that synthesizes information from the relevant chunks."""
+        # Build the prompt incrementally so each chunk's text is copied
+        # once, instead of being re-walked by join + f-string formatting
+        buf = io.StringIO()
+        buf.write("Based on the following context and query, provide a comprehensive answer.\n\n")
+        buf.write(f"Query: {query}\n\nContext:\n")
+        for i, chunk in enumerate(chunks):
+            buf.write(f"\nChunk {i+1}:\n")
+            buf.write(chunk['text'][:MAX_CHUNK_CHARS])
+            buf.write("\n")
+        buf.write("\nPlease provide a detailed answer that synthesizes information from the relevant chunks.")
+        prompt = buf.getvalue()
 
         # Get response from Mistral
+        client, model = get_mistral()
         response = client.chat.complete(
             model=model,
             messages=[
@@ -143,12 +154,24 @@ if st.button("Process Selected Document"):
     else:
         st.warning("Please select or upload a document to process")
 
+# Batch processing across all local documents, one worker per core
+if st.button("Process All Local Documents"):
+    if local_docs:
+        paths = [os.path.join('downloads', f) for f in local_docs]
+        with st.spinner(f"Processing {len(paths)} documents in parallel..."):
+            processed = pipeline.process_batch(paths)
+            embedding.save_chunked_texts(processed)
+        st.success(f"Processed {len(processed)} of {len(paths)} documents!")
+    else:
+        st.warning("No local documents to process")
+
 # Query interface
 st.write("## Query Interface")
 query = st.text_input("Enter your query:")
 if query:
-    vector_store = VectorStore()
-    vector_store.load_embeddings()
+    vector_store = get_store()
+    # Only rebuilds when an embeddings file is newer than the saved index
+    vector_store.sync_if_dirty('chunked_texts')
     results = vector_store.query(query, n_results=5)
     if results:
         st.write("### Query Results:")
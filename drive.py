@@ -1,6 +1,5 @@
 # Standard library imports
 import os
-import io
 import sqlite3
 from datetime import datetime
 
@@ -21,7 +20,12 @@ def init_database():
     """Initialize SQLite database to store file information"""
     conn = sqlite3.connect('drive_files.db')
     cursor = conn.cursor()
-    
+
+    # WAL avoids serializing bulk syncs on fsync
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+
     # Create table to store file information
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS drive_files (
@@ -91,53 +95,82 @@ def list_drive_files(service, page_size=10):
         print(f"Error listing files: {e}")
         return []
 
-def download_file(service, file_id, file_name, conn):
-    """Download a file from Drive and store its info in database"""
-    try:
-        # Create downloads directory if it doesn't exist
-        if not os.path.exists('downloads'):
-            os.makedirs('downloads')
-            
-        # Set up the download path
-        download_path = os.path.join('downloads', file_name)
-        
-        # Get the file from Drive
-        request = service.files().get_media(fileId=file_id)
-        file_handle = io.BytesIO()
-        
-        # Download the file
-        downloader = MediaIoBaseDownload(file_handle, request)
+INSERT_FILE_SQL = '''
+    INSERT OR REPLACE INTO drive_files
+    (file_id, file_name, mime_type, downloaded_path, download_date, file_size)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+def _fetch_file(service, file_id, file_name):
+    """Download one file to disk and return its database row"""
+    # Create downloads directory if it doesn't exist
+    if not os.path.exists('downloads'):
+        os.makedirs('downloads')
+
+    # Set up the download path
+    download_path = os.path.join('downloads', file_name)
+
+    # Get the file from Drive
+    request = service.files().get_media(fileId=file_id)
+
+    # Stream straight to disk; the 8MB chunk size cuts per-chunk
+    # HTTP overhead compared to the ~100KB default
+    with open(download_path, 'wb') as file_handle:
+        downloader = MediaIoBaseDownload(file_handle, request,
+                                         chunksize=8 * 1024 * 1024)
         done = False
-        
+
         while not done:
-            status, done = downloader.next_chunk()
+            status, done = downloader.next_chunk(num_retries=3)
             print(f"Download Progress: {int(status.progress() * 100)}%")
-            
-        # Save the file locally
-        file_handle.seek(0)
-        with open(download_path, 'wb') as f:
-            f.write(file_handle.read())
-            
-        # Get file size
-        file_size = os.path.getsize(download_path)
-        
-        # Get file metadata for mime type
-        file_metadata = service.files().get(fileId=file_id, fields='mimeType').execute()
-        mime_type = file_metadata.get('mimeType', 'unknown')
-        
+
+    # Get file size
+    file_size = os.path.getsize(download_path)
+
+    # Get file metadata for mime type
+    file_metadata = service.files().get(fileId=file_id, fields='mimeType').execute()
+    mime_type = file_metadata.get('mimeType', 'unknown')
+
+    return (file_id, file_name, mime_type, download_path, datetime.now(), file_size)
+
+def download_file(service, file_id, file_name, conn):
+    """Download a file from Drive and store its info in database"""
+    try:
+        row = _fetch_file(service, file_id, file_name)
+
         # Store file information in database
         cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO drive_files 
-            (file_id, file_name, mime_type, downloaded_path, download_date, file_size)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (file_id, file_name, mime_type, download_path, datetime.now(), file_size))
-        
+        cursor.execute(INSERT_FILE_SQL, row)
+
         conn.commit()
-        print(f"\nFile '{file_name}' downloaded successfully to {download_path}")
-        
+        print(f"\nFile '{file_name}' downloaded successfully to {row[3]}")
+        return row[3]
+
     except Exception as e:
         print(f"Error downloading file: {e}")
+        return None
+
+def download_files_batch(service, ids_names, conn):
+    """Download several files and record them with one batched insert.
+
+    ids_names is an iterable of (file_id, file_name) pairs. Returns the
+    list of downloaded paths.
+    """
+    ids_names = list(ids_names)
+    rows = []
+    for file_id, file_name in ids_names:
+        try:
+            rows.append(_fetch_file(service, file_id, file_name))
+        except Exception as e:
+            print(f"Error downloading file '{file_name}': {e}")
+
+    if rows:
+        cursor = conn.cursor()
+        cursor.executemany(INSERT_FILE_SQL, rows)
+        conn.commit()
+        print(f"\nDownloaded {len(rows)} of {len(ids_names)} files")
+
+    return [row[3] for row in rows]
 
 def main():
     print("Initializing Google Drive File Manager...")
@@ -1,26 +1,23 @@
 import os
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import re
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from sentence_transformers import SentenceTransformer, CrossEncoder
 import numpy as np
 import json
 
-# Initialize models lazily
-_model = None
-_reranker = None
+import models
 
+# Compiled once; these run per-line over every document
+_MULTI_NL = re.compile(r'\n\s*\n')
+_MULTI_SP = re.compile(r' +')
+_HEADER_RE = re.compile(r'^[A-Z\s]{5,}$')
+
+# Models live in models.py so they are shared with VectorDB
 def get_model():
-    global _model
-    if _model is None:
-        _model = SentenceTransformer('BAAI/bge-small-en-v1.5')
-    return _model
+    return models.bi_encoder()
 
 def get_reranker():
-    global _reranker
-    if _reranker is None:
-        _reranker = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
-    return _reranker
+    return models.cross_encoder()
 
 def load_extracted_texts() -> Dict[str, str]:
     texts = {}
@@ -46,41 +43,43 @@ def clean_text(text: str) -> str:
     text = text.replace('', '')
 
     # Remove multiple newlines
-    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = _MULTI_NL.sub('\n\n', text)
 
     # Remove multiple spaces
-    text = re.sub(r' +', ' ', text)
+    text = _MULTI_SP.sub(' ', text)
 
     # Remove leading/trailing whitespace
     text = text.strip()
 
     return text
 
-def split_by_headers(text: str, min_chunk_length=300) -> List[str]:
+def split_by_headers(text: str, min_chunk_length=300) -> List[Tuple[str, str]]:
+    """Split text into (chunk, header) pairs in a single pass.
+
+    The header is the first header-style line in each chunk, tracked while
+    accumulating so no second regex scan over the chunks is needed.
+    """
     lines = text.splitlines()
     sections = []
     current_chunk = []
-    
+    current_header = None
+
     for line in lines:
-        if re.match(r'^[A-Z\\s]{5,}$', line.strip()):
+        stripped = line.strip()
+        if _HEADER_RE.match(stripped):
             # Store previous chunk if it's long enough
             if current_chunk and len(' '.join(current_chunk)) >= min_chunk_length:
-                sections.append("\n".join(current_chunk))
+                sections.append(("\n".join(current_chunk), current_header or "Unknown"))
                 current_chunk = []
+                current_header = None
+            if current_header is None:
+                current_header = stripped
         current_chunk.append(line)
-    
-    if current_chunk:
-        sections.append("\n".join(current_chunk))
-    
-    return sections
 
+    if current_chunk:
+        sections.append(("\n".join(current_chunk), current_header or "Unknown"))
 
-def extract_heading(chunk: str) -> str:
-    lines = chunk.strip().splitlines()
-    for line in lines:
-        if re.match(r'^[A-Z\s]{5,}$', line.strip()):
-            return line.strip()
-    return "Unknown"
+    return sections
 
 def create_embeddings(chunks: List[str]) -> List[np.ndarray]:
     model = get_model()
@@ -97,15 +96,33 @@ def rerank_chunks(query: str, chunks: List[str]) -> List[str]:
 def process_all_texts() -> Dict[str, Dict[str, List]]:
     texts = load_extracted_texts()
     processed_texts = {}
+
+    # Pass 1: chunk every file, collecting one flat list so the encoder
+    # sees a single large batch instead of one small batch per file
+    flat_chunks = []
+    per_file = []
     for filename, text in texts.items():
         cleaned_text = clean_text(text)
-        chunks = split_by_headers(cleaned_text)
-        embeddings = create_embeddings(chunks)
-        headers = [extract_heading(chunk) for chunk in chunks]
+        pairs = split_by_headers(cleaned_text)
+        chunks = [chunk for chunk, _ in pairs]
+        headers = [header for _, header in pairs]
+        per_file.append((filename, chunks, headers, len(flat_chunks)))
+        flat_chunks.extend(chunks)
+
+    if not flat_chunks:
+        return processed_texts
+
+    # Pass 2: one batched encode across all files
+    embeddings = get_model().encode(
+        flat_chunks, batch_size=64, show_progress_bar=False,
+        convert_to_numpy=True)
+
+    # Pass 3: slice the batch back out per file
+    for filename, chunks, headers, offset in per_file:
         processed_texts[filename] = {
             'chunks': chunks,
             'headers': headers,
-            'embeddings': embeddings.tolist()
+            'embeddings': embeddings[offset:offset + len(chunks)]
         }
     return processed_texts
 
@@ -125,13 +142,18 @@ def save_chunked_texts(processed_texts: Dict[str, Dict[str, List]]):
         except Exception as e:
             print(f"Error saving chunks for {filename}: {str(e)}")
 
-        embeddings_file = os.path.join('chunked_texts', f"{os.path.splitext(filename)[0]}_embeddings.json")
+        # Embeddings go to a binary .npy with a small JSON sidecar for the
+        # chunks and headers -- far smaller and faster to load than
+        # serializing the matrix as JSON text. float16 on disk halves I/O
+        # with negligible recall loss; the loader upcasts to float32.
+        embeddings_file = os.path.join('chunked_texts', f"{os.path.splitext(filename)[0]}_embeddings.npy")
+        sidecar_file = os.path.join('chunked_texts', f"{os.path.splitext(filename)[0]}_chunks.json")
         try:
-            with open(embeddings_file, 'w', encoding='utf-8') as f:
+            np.save(embeddings_file, np.asarray(data['embeddings'], dtype=np.float16))
+            with open(sidecar_file, 'w', encoding='utf-8') as f:
                 json.dump({
                     'chunks': data['chunks'],
-                    'headers': data['headers'],
-                    'embeddings': data['embeddings']
+                    'headers': data['headers']
                 }, f, indent=2)
             print(f"Saved embeddings to {embeddings_file}")
         except Exception as e:
@@ -1,18 +1,25 @@
 import os
 from mistralai import Mistral
 
-# Use the API key directly
-client = Mistral(api_key="your_api_key_here")
+model = os.getenv("MISTRAL_MODEL", "mistral-large-latest")
 
-model = "mistral-large-latest"
+# Client is created lazily so importing this module costs nothing
+_client = None
 
-chat_response = client.chat.complete(
-    model= model,
-    messages = [
-        {
-            "role": "user",
-            "content": "What is the best French cheese?",
-        },
-    ]
-)
-print(chat_response.choices[0].message.content)
\ No newline at end of file
+def get_client():
+    global _client
+    if _client is None:
+        _client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
+    return _client
+
+if __name__ == "__main__":
+    chat_response = get_client().chat.complete(
+        model=model,
+        messages=[
+            {
+                "role": "user",
+                "content": "What is the best French cheese?",
+            },
+        ]
+    )
+    print(chat_response.choices[0].message.content)
@@ -0,0 +1,15 @@
+import functools
+from sentence_transformers import SentenceTransformer, CrossEncoder
+
+# Single home for the transformer models so VectorDB and embedding share
+# one copy of the weights per process instead of loading them twice.
+
+@functools.lru_cache(maxsize=None)
+def bi_encoder() -> SentenceTransformer:
+    """Shared BGE-small embedding model, loaded on first use."""
+    return SentenceTransformer('BAAI/bge-small-en-v1.5')
+
+@functools.lru_cache(maxsize=None)
+def cross_encoder() -> CrossEncoder:
+    """Shared MiniLM reranker, loaded on first use."""
+    return CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2')
@@ -0,0 +1,58 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import embedding
+import pdfocr
+
+def process_one(pdf_path: str) -> Tuple[str, Optional[Dict[str, List]]]:
+    """Run the extract -> clean -> chunk -> embed pipeline for one PDF.
+
+    Returns (filename, data) where data matches the per-file entries of
+    embedding.process_all_texts, or None if no text could be extracted.
+    The embedding model is a lazy module-level singleton, so each pool
+    worker loads it once on first use.
+    """
+    base = os.path.splitext(os.path.basename(pdf_path))[0]
+    filename = f"{base}_text.txt"
+
+    text = pdfocr.extract_text_from_pdf(pdf_path)
+    if not text:
+        text = pdfocr.extract_text_with_ocr(pdf_path)
+    if not text:
+        return filename, None
+
+    # Keep the extracted text on disk, matching the single-file app path
+    os.makedirs('extracted_text', exist_ok=True)
+    extracted_path = os.path.join('extracted_text', filename)
+    with open(extracted_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+    cleaned = embedding.clean_text(text)
+    pairs = embedding.split_by_headers(cleaned)
+    chunks = [chunk for chunk, _ in pairs]
+    headers = [header for _, header in pairs]
+    embeddings = embedding.get_model().encode(
+        chunks, batch_size=64, show_progress_bar=False, convert_to_numpy=True)
+
+    return filename, {
+        'chunks': chunks,
+        'headers': headers,
+        'embeddings': embeddings
+    }
+
+def process_batch(pdf_paths: List[str], max_workers: int = None) -> Dict[str, Dict[str, List]]:
+    """Process many PDFs across a process pool.
+
+    OCR and embedding are CPU-bound and per-file independent, so this
+    scales close to linearly with core count. Returns the same mapping
+    as embedding.process_all_texts, ready for save_chunked_texts.
+    """
+    processed = {}
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as ex:
+        for filename, data in ex.map(process_one, pdf_paths):
+            if data is not None:
+                processed[filename] = data
+            else:
+                print(f"No text extracted from {filename}")
+    return processed